@@ -1,12 +1,30 @@
+import bisect
+import codecs
+import collections
+import queue
+import re
 import sys
+from array import array
 import time
 from typing import Optional
 
 from PyQt6 import QtWidgets, QtCore, QtGui
 
+# Port filtresinde aranan tek igne: 'standard serial over bluetooth'
+# aciklamalari da bunu icerdiginden ikinci bir tarama gereksiz
+BT_NEEDLE = 'bluetooth'
+
+# Tek karakterlik komut kumesi icin import aninda encode edilmis bytes;
+# tus tekrarinda her gonderim icin UTF-8 codec yolu calismasin
+_SEND_BYTES = {c: c.encode('ascii') for c in '123456dawc[]VRTPSLZ'}
+
+
+def _now_ms() -> int:
+    # Monotonik ms: NTP adimlarindan etkilenmez, float yuvarlamasi yok
+    return time.monotonic_ns() // 1_000_000
+
 
 class SerialWorker(QtCore.QThread):
-    line_received = QtCore.pyqtSignal(str)
     connected = QtCore.pyqtSignal(str)
     disconnected = QtCore.pyqtSignal()
 
@@ -16,6 +34,12 @@ class SerialWorker(QtCore.QThread):
         self._ser = None
         self._stop = False
         self._port_requested: Optional[str] = None
+        # SPSC ring buffer: worker append eder, GUI timer'i popleft ile bosaltir.
+        # CPython'da deque append/popleft atomiktir; maxlen bellegi sinirlar.
+        self.rx_buffer: collections.deque = collections.deque(maxlen=1 << 16)
+        # Satir tamponlama: yarim satirlar newline gelene kadar bekletilir,
+        # boylece durum mesajlari okuma sinirlarinda bolunmez
+        self._line_buf = bytearray()
 
     def request_port(self, port: Optional[str]):
         self._port_requested = port
@@ -38,17 +62,27 @@ class SerialWorker(QtCore.QThread):
                     time.sleep(0.1)
                     continue
 
-            # Bagli iken oku
+            # Bagli iken oku: bloklayan read(1) ilk byte gelir gelmez doner,
+            # bekleme suresi port timeout'u ile saglanir (poll + sleep yok).
+            # Porta lokal referans: dongu basina attribute lookup yapma
+            ser = self._ser
             try:
-                waiting = getattr(self._ser, 'in_waiting', 0)
-                data = self._ser.read(waiting or 1)
+                data = ser.read(1)
                 if data:
-                    try:
-                        text = data.decode(errors='ignore')
-                    except Exception:
-                        text = str(data)
-                    self.line_received.emit(text)
-                time.sleep(0.01)
+                    waiting = ser.in_waiting
+                    if waiting:
+                        data += ser.read(waiting)
+                    # Decode yok: ham bytes ring buffer'a, GUI toplu decode eder.
+                    # Tam satirlari gonder, kuyruktaki yarim satiri bekletelim
+                    self._line_buf += data
+                    cut = self._line_buf.rfind(b'\n') + 1
+                    if cut:
+                        self.rx_buffer.append(bytes(self._line_buf[:cut]))
+                        del self._line_buf[:cut]
+                    elif len(self._line_buf) >= 256:
+                        # Newline gondermeyen cikti birikmesin
+                        self.rx_buffer.append(bytes(self._line_buf))
+                        self._line_buf.clear()
             except Exception:
                 self._safe_close()
                 self.disconnected.emit()
@@ -60,10 +94,17 @@ class SerialWorker(QtCore.QThread):
         self.wait(1000)
 
     def send_char(self, ch: str):
+        data = _SEND_BYTES.get(ch)
+        if data is None:  # tablo disi karakterler (ör. hiz rakamlari)
+            data = ch.encode('utf-8', errors='ignore')
+        self.send_bytes(data)
+
+    def send_bytes(self, data: bytes):
+        # Tek write() cagrisi ile gonder (byte basina syscall yok)
         if self._ser is None:
             return
         try:
-            self._ser.write(ch.encode('utf-8', errors='ignore'))
+            self._ser.write(data)
         except Exception:
             self._safe_close()
             self.disconnected.emit()
@@ -75,12 +116,40 @@ class SerialWorker(QtCore.QThread):
     def _try_connect(self, port: str):
         try:
             import serial  # type: ignore
-            self._ser = serial.Serial(port, baudrate=self._baud, timeout=0.1)
+            # Kisa timeout: run() icindeki bloklayan read(1) en fazla 50 ms bekler
+            self._ser = serial.Serial(port, baudrate=self._baud, timeout=0.05)
+            self._tune_latency()
             time.sleep(2.0)  # Arduino reset bekleme
             self.connected.emit(port)
         except Exception:
             self._ser = None
 
+    def _tune_latency(self):
+        # FTDI tabanli donusturucularin varsayilan 16 ms tamponlamasini dusur;
+        # desteklemeyen portlarda (ör. sanal COM) sessizce gecilir
+        if sys.platform.startswith('linux'):
+            try:
+                import array
+                import fcntl
+                TIOCGSERIAL = 0x541E
+                TIOCSSERIAL = 0x541F
+                ASYNC_LOW_LATENCY = 0x2000
+                buf = array.array('i', [0] * 32)
+                fcntl.ioctl(self._ser.fileno(), TIOCGSERIAL, buf)
+                buf[4] |= ASYNC_LOW_LATENCY  # flags alani
+                fcntl.ioctl(self._ser.fileno(), TIOCSSERIAL, buf)
+            except Exception:
+                pass
+        elif sys.platform.startswith('win'):
+            # COMMTIMEOUTS'a dokunma: pyserial timeout=0.05'ten kendisi kurar,
+            # ustune yazmak run() icindeki bloklayan read(1)'i bozar (busy-spin).
+            # FTDI'nin 16 ms latency timer'i surucu/registry ayaridir; burada
+            # sadece surucu tamponlarini buyutuyoruz.
+            try:
+                self._ser.set_buffer_size(rx_size=4096, tx_size=4096)
+            except Exception:
+                pass
+
     def _safe_close(self):
         try:
             if self._ser is not None:
@@ -90,7 +159,105 @@ class SerialWorker(QtCore.QThread):
         self._ser = None
 
 
+class LogWriterThread(QtCore.QThread):
+    """operations.txt yazimini GUI thread'inden ayirir.
+
+    UI tarafi sadece kuyruga ekler; diskin yavas oldugu durumlarda
+    (ör. bulut-senkronize klasor) arayuz bloklanmaz. Kuyruk bosalinca
+    flush edilir, boylece yazmalar dogal olarak birlestirilir.
+    """
+
+    _TRUNCATE = object()  # dosyayi bosalt komutu
+
+    def __init__(self, path: str, parent=None):
+        super().__init__(parent)
+        self._path = path
+        self._q: queue.Queue = queue.Queue(maxsize=10_000)
+        self._stop = False
+
+    def append(self, ts: float, line: str):
+        # Formatlama run() icinde yapilir; UI tarafi sadece ham degerleri koyar
+        try:
+            self._q.put_nowait((ts, line))
+        except queue.Full:
+            pass
+
+    def truncate(self):
+        try:
+            self._q.put_nowait(self._TRUNCATE)
+        except queue.Full:
+            pass
+
+    def stop(self):
+        self._stop = True
+        self.wait(2000)
+
+    def run(self):
+        fh = self._open()
+        while True:
+            try:
+                entry = self._q.get(timeout=0.2)
+            except queue.Empty:
+                if self._stop:
+                    break
+                continue
+            if entry is self._TRUNCATE:
+                if fh is not None:
+                    try:
+                        fh.close()
+                    except Exception:
+                        pass
+                try:
+                    open(self._path, 'w', encoding='utf-8').close()
+                except Exception:
+                    pass
+                fh = self._open()
+                continue
+            if fh is not None:
+                # Insan-okur zaman damgasi burada, yazici thread'de uretilir;
+                # strftime QDateTime formatlamasindan kat kat ucuz
+                ts, line = entry
+                stamp = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(ts))
+                try:
+                    fh.write(f"[{stamp}.{int(ts % 1 * 1000):03d}] {line}\n")
+                    if self._q.empty():
+                        fh.flush()
+                except Exception:
+                    pass
+        if fh is not None:
+            try:
+                fh.close()
+            except Exception:
+                pass
+
+    def _open(self):
+        try:
+            return open(self._path, 'a', encoding='utf-8', buffering=64 * 1024)
+        except Exception:
+            return None
+
+
 class MainWindow(QtWidgets.QMainWindow):
+    # Sabit komut kumesi icin onceden encode edilmis byte tablolari;
+    # gonderim yolunda int->str->encode zinciri calismasin
+    _MOTOR_BYTES = {i: str(i).encode('ascii') for i in range(1, 7)}
+    _CMD_BYTES = {c: c.encode('ascii') for c in 'daw[]cRTPSLV'}
+
+    # Komut dagitimi if/elif zinciri yerine tablo ile:
+    # servo icin (mutlak mi, deger), stepper icin yon kodu
+    _SERVO_DELTA = {'c': ('set', 0), '[': ('add', 15), ']': ('add', -15),
+                    'd': ('add', 60), 'a': ('add', -60)}
+    _MOTION_DIR = {'d': 1, 'a': 2}
+
+    # Arduino durum mesajlari icin tek gecisli siniflandirici; alti ayri
+    # substring taramasi yerine derlenmis tek regex
+    _STATUS_RE = re.compile(
+        r'\[rec\] kayit (?P<rec>basladi|durdu)'
+        r'|\[play\] oynatma (?P<play>basladi|durdu)'
+        r'|loop:[^\n]*?(?P<loop>acik|kapali)',
+        re.IGNORECASE,
+    )
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle('Robot Kol - Seri Kontrol')
@@ -98,12 +265,41 @@ class MainWindow(QtWidgets.QMainWindow):
 
         # Operasyon kaydi ve geri alma icin durum
         self.active_motor: Optional[int] = None
-        self.selected_motors: set[int] = set()  # Çoklu motor seçimi için
-        self.segment_start_ms = {1: None, 2: None, 3: None, 4: None, 5: None}  # type: ignore
-        self.segment_dir = {1: None, 2: None, 3: None, 4: None, 5: None}       # 1=d, 2=a  # type: ignore
+        # Secili motorlar, artan sirada tutulur (bisect.insort); her gonderimde
+        # yeniden sort etmeye gerek kalmaz
+        self.selected_motors: list[int] = []
+        # Secimden turetilmis alt kumeler; her komutta filtrelemek yerine
+        # secim degistiginde guncellenir
+        self._stepper_selected: set[int] = set()
+        self._servo_selected: bool = False
+        # Arduino tarafinda en son secilen motor; ayni motora pespese komutta
+        # secim byte'ini tekrar gondermemek icin izlenir
+        self._last_motor_sent: Optional[int] = None
+        # Segment durumu: motor m icin indeks m-1; -1/0 "aktif segment yok"
+        self.segment_start_ms = array('q', [-1] * 6)
+        self.segment_dir = array('b', [0] * 6)  # 1=d, 2=a
         self.reverse_actions: list[tuple[int, int, int]] = []  # (motor, inverse_dir, duration_ms)
+        self._home_steps: list[tuple[int, int, int]] = []  # oynatilmayi bekleyen geri alma adimlari
+        self._home_done_msg: str = ''
+        self._home_active: bool = False  # singleShot zinciri calisirken yeni oynatma baslamasin
         self.servo_angle_local: int = 0  # 0..180, baslangic 0
         self.ops_file = 'operations.txt'
+        # Port listesi cache'i: (monotonic zaman, filtrelenmis girdiler);
+        # SetupAPI/udev taramasini her tiklamada tekrarlama
+        self._ports_cache: tuple[float, list[tuple[str, str]]] = (0.0, [])
+        self._last_ports: Optional[tuple[tuple[str, str], ...]] = None  # combobox'taki liste
+        # Demetler arasinda bolunen cok byte'li karakterleri kaybetmemek icin
+        # artimli decoder; kuyrugu bir sonraki decode'a tasir
+        self._rx_decoder = codecs.getincrementaldecoder('utf-8')(errors='ignore')
+        # Operasyon logu ayri bir yazici thread'e kuyrukla aktarilir;
+        # GUI thread'i hicbir zaman diske dokunmaz
+        self._ops_writer = LogWriterThread(self.ops_file)
+        self._ops_writer.start()
+        # Zaman damgasi: pahali QDateTime formatlamasi yerine bir kez alinan
+        # epoch + monotonik gecen sure
+        self._log_epoch = time.time()
+        self._log_elapsed = QtCore.QElapsedTimer()
+        self._log_elapsed.start()
 
         # Arduino kayıt/oynatma sistemi kullanılıyor
 
@@ -145,14 +341,19 @@ class MainWindow(QtWidgets.QMainWindow):
         # Motor seçimi için checkbox'lar ve butonlar
         motor_selection_layout = QtWidgets.QHBoxLayout()
         motor_labels = ['Kafa', 'Kafa Sağ Sol', 'Boyun', 'Gövde', 'SağSol', 'Gripper']
-        self.motor_checkboxes = {}
-        
+        self.motor_checkboxes: list[QtWidgets.QCheckBox] = []  # indeks: motor-1
+
+        # Checkbox basina lambda yerine tek QButtonGroup: motor id'si Qt'nin
+        # kendi integer-id yonlendirmesiyle gelir
+        self._motor_group = QtWidgets.QButtonGroup(self)
+        self._motor_group.setExclusive(False)
         for idx, label in enumerate(motor_labels, start=1):
             checkbox = QtWidgets.QCheckBox(f"M{idx}: {label}")
             checkbox.setToolTip(f"Motor {idx} - {label}")
-            checkbox.stateChanged.connect(lambda state, motor=idx: self.toggle_motor_selection(motor, state))
-            self.motor_checkboxes[idx] = checkbox
+            self._motor_group.addButton(checkbox, idx)
+            self.motor_checkboxes.append(checkbox)
             motor_selection_layout.addWidget(checkbox)
+        self._motor_group.idToggled.connect(self._on_motor_toggled)
         
         # Çoklu motor kontrol butonları
         select_all_btn = QtWidgets.QPushButton('Hepsini Seç')
@@ -170,9 +371,10 @@ class MainWindow(QtWidgets.QMainWindow):
         btn_d = QtWidgets.QPushButton('d (ileri/+60)')
         btn_a = QtWidgets.QPushButton('a (geri/-60)')
         btn_w = QtWidgets.QPushButton('w (dur/bekle)')
-        btn_d.clicked.connect(lambda: self.handle_motion('d'))
-        btn_a.clicked.connect(lambda: self.handle_motion('a'))
-        btn_w.clicked.connect(lambda: self.handle_motion('w'))
+        # Buton basina lambda yerine ortak slot; komut karakteri property'de
+        for btn, code in ((btn_d, 'd'), (btn_a, 'a'), (btn_w, 'w')):
+            btn.setProperty('cmd', code)
+            btn.clicked.connect(self._on_motion_btn)
         grid.addWidget(btn_d, row, 0)
         grid.addWidget(btn_a, row, 1)
         grid.addWidget(btn_w, row, 2)
@@ -182,9 +384,9 @@ class MainWindow(QtWidgets.QMainWindow):
         btn_lb = QtWidgets.QPushButton('[ (+15)')
         btn_rb = QtWidgets.QPushButton('] (-15)')
         btn_c = QtWidgets.QPushButton('c (0°)')
-        btn_lb.clicked.connect(lambda: self.handle_servo('['))
-        btn_rb.clicked.connect(lambda: self.handle_servo(']'))
-        btn_c.clicked.connect(lambda: self.handle_servo('c'))
+        for btn, code in ((btn_lb, '['), (btn_rb, ']'), (btn_c, 'c')):
+            btn.setProperty('cmd', code)
+            btn.clicked.connect(self._on_servo_btn)
         grid.addWidget(btn_lb, row, 0)
         grid.addWidget(btn_rb, row, 1)
         grid.addWidget(btn_c, row, 2)
@@ -198,12 +400,11 @@ class MainWindow(QtWidgets.QMainWindow):
         loop_toggle_btn = QtWidgets.QPushButton('Loop Aç/Kapa')
         info_btn = QtWidgets.QPushButton('Bilgi (V)')
 
-        rec_start_btn.clicked.connect(lambda: self._rec_play_action('R'))
-        rec_stop_btn.clicked.connect(lambda: self._rec_play_action('T'))
-        play_start_btn.clicked.connect(lambda: self._rec_play_action('P'))
-        play_stop_btn.clicked.connect(lambda: self._rec_play_action('S'))
-        loop_toggle_btn.clicked.connect(lambda: self._rec_play_action('L'))
-        info_btn.clicked.connect(lambda: self._rec_play_action('V'))
+        for btn, code in ((rec_start_btn, 'R'), (rec_stop_btn, 'T'),
+                          (play_start_btn, 'P'), (play_stop_btn, 'S'),
+                          (loop_toggle_btn, 'L'), (info_btn, 'V')):
+            btn.setProperty('cmd', code)
+            btn.clicked.connect(self._on_rec_play_btn)
 
         grid.addWidget(rec_start_btn, row, 0)
         grid.addWidget(rec_stop_btn,  row, 1)
@@ -223,26 +424,40 @@ class MainWindow(QtWidgets.QMainWindow):
         layout.addLayout(status_bar2)
 
         # Home'a don ve kaydi sifirla
-        btn_home = QtWidgets.QPushButton('Home\'a Dön (Geri Al)')
+        self.btn_home = QtWidgets.QPushButton('Home\'a Dön (Geri Al)')
         btn_reset = QtWidgets.QPushButton('Kaydı Sıfırla')
-        btn_home.clicked.connect(self.return_to_home)
+        self.btn_home.clicked.connect(self.return_to_home)
         btn_reset.clicked.connect(self.reset_operations)
-        grid.addWidget(btn_home, row, 0)
+        grid.addWidget(self.btn_home, row, 0)
         grid.addWidget(btn_reset, row, 1)
         layout.addLayout(grid)
 
         # Log penceresi
         self.log = QtWidgets.QPlainTextEdit()
         self.log.setReadOnly(True)
+        self.log.setMaximumBlockCount(5000)  # sinirsiz buyumeyi engelle
         layout.addWidget(self.log)
 
+        # Log eklemelerini birlestir: her chunk icin ayri layout/repaint yerine
+        # 50 ms'de bir tek appendPlainText cagrisi
+        self._log_pending: list[str] = []
+        self._log_flush_timer = QtCore.QTimer(self)
+        self._log_flush_timer.setInterval(50)
+        self._log_flush_timer.timeout.connect(self._flush_log_pending)
+        self._log_flush_timer.start()
+
         # Serial worker
         self.worker = SerialWorker(baud=9600)
-        self.worker.line_received.connect(self.on_serial_line)
         self.worker.connected.connect(self.on_connected)
         self.worker.disconnected.connect(self.on_disconnected)
         self.worker.start()
 
+        # Ring buffer'i ~60 Hz bosalt: chunk basina sinyal yerine tek timer
+        self._rx_drain_timer = QtCore.QTimer(self)
+        self._rx_drain_timer.setInterval(16)
+        self._rx_drain_timer.timeout.connect(self._drain_rx_buffer)
+        self._rx_drain_timer.start()
+
         # UI baglantilari
         self.refresh_btn.clicked.connect(self.refresh_ports)
         self.connect_btn.clicked.connect(self.manual_connect)
@@ -258,28 +473,46 @@ class MainWindow(QtWidgets.QMainWindow):
             self.worker.stop()
         except Exception:
             pass
+        try:
+            self._ops_writer.stop()
+        except Exception:
+            pass
         super().closeEvent(event)
 
     def refresh_ports(self):
-        self.port_combo.clear()
+        # Shift ile tiklama cache'i atlayip cihaz agacini yeniden tarar
+        force = bool(QtWidgets.QApplication.keyboardModifiers()
+                     & QtCore.Qt.KeyboardModifier.ShiftModifier)
+        now = time.monotonic()
+        cache_ts, entries = self._ports_cache
+        if force or now - cache_ts >= 2.0:
+            try:
+                from serial.tools import list_ports  # type: ignore
+                entries = []
+                for p in list_ports.comports():
+                    if BT_NEEDLE in (p.description or '').lower():
+                        continue
+                    entries.append((str(p.device), str(p.description)))
+                self._ports_cache = (now, entries)
+            except Exception:
+                return
+        # Liste degismediyse combobox'i hic elleme (O(n) model sinyali yok)
+        entries_key = tuple(entries)
+        if entries_key == self._last_ports:
+            return
+        self._last_ports = entries_key
+        self.port_combo.blockSignals(True)
         try:
-            from serial.tools import list_ports  # type: ignore
-            ports = list_ports.comports()
+            self.port_combo.clear()
             target_index = -1
-            idx_ui = 0
-            for p in ports:
-                desc = (p.description or '').lower()
-                is_bt = ('bluetooth' in desc) or ('standard serial over bluetooth' in desc)
-                if is_bt:
-                    continue
-                self.port_combo.addItem(f"{p.device} - {p.description}", p.device)
-                if str(p.device).upper() == 'COM6':
+            for idx_ui, (device, description) in enumerate(entries):
+                self.port_combo.addItem(f"{device} - {description}", device)
+                if device.upper() == 'COM6':
                     target_index = idx_ui
-                idx_ui += 1
             if target_index >= 0:
                 self.port_combo.setCurrentIndex(target_index)
-        except Exception:
-            pass
+        finally:
+            self.port_combo.blockSignals(False)
 
     def manual_connect(self):
         device = self.port_combo.currentData()
@@ -287,32 +520,49 @@ class MainWindow(QtWidgets.QMainWindow):
             self.status_lbl.setText(f"Durum: Bağlanıyor ({device})...")
             self.worker.connect_to_port(str(device))
 
+    def _drain_rx_buffer(self):
+        rb = self.worker.rx_buffer
+        if not rb:
+            return
+        parts = []
+        while True:
+            try:
+                parts.append(rb.popleft())
+            except IndexError:
+                break
+        # Chunk basina degil, toplanan demet basina tek decode
+        self.on_serial_line(self._rx_decoder.decode(b''.join(parts)))
+
     def on_serial_line(self, text: str):
-        # Arduino'dan gelen mesajları analiz et ve UI'yi güncelle
-        text_lower = text.lower()
-        
-        # Kayıt durumu güncellemeleri
-        if '[rec] kayit basladi' in text_lower:
-            self.lbl_rec.setText('Kayıt: Açık')
-        elif '[rec] kayit durdu' in text_lower:
-            self.lbl_rec.setText('Kayıt: Kapalı')
-        elif '[play] oynatma basladi' in text_lower:
-            self.lbl_play.setText('Oynatma: Açık')
-        elif '[play] oynatma durdu' in text_lower:
-            self.lbl_play.setText('Oynatma: Kapalı')
-        elif 'loop:' in text_lower and 'acik' in text_lower:
-            self.lbl_loop.setText('Loop: Açık')
-        elif 'loop:' in text_lower and 'kapali' in text_lower:
-            self.lbl_loop.setText('Loop: Kapalı')
-        
-        # Basit ve guvenli: dogrudan ekle
-        self.log.appendPlainText(text)
+        # Arduino'dan gelen mesajları analiz et ve UI'yi güncelle;
+        # toplu gelen metinde birden fazla durum satiri olabilir
+        for m in self._STATUS_RE.finditer(text):
+            rec, play, loop = m.group('rec'), m.group('play'), m.group('loop')
+            if rec:
+                self.lbl_rec.setText('Kayıt: Açık' if rec.lower() == 'basladi' else 'Kayıt: Kapalı')
+            elif play:
+                self.lbl_play.setText('Oynatma: Açık' if play.lower() == 'basladi' else 'Oynatma: Kapalı')
+            elif loop:
+                self.lbl_loop.setText('Loop: Açık' if loop.lower() == 'acik' else 'Loop: Kapalı')
+
+        # Timer flush'inda toplu olarak eklenecek
+        self._log_pending.append(text)
+
+    def _flush_log_pending(self):
+        if self._log_pending:
+            self.log.appendPlainText(''.join(self._log_pending).rstrip('\n'))
+            self._log_pending.clear()
 
     def on_connected(self, port: str):
+        # Baglanti oncesi tiklamalar cursor'u zehirlemis olabilir (send_bytes
+        # port yokken sessizce donuyor): secim byte'i bastan gonderilsin
+        self._last_motor_sent = None
         self.status_lbl.setText(f'Durum: Bağlı ({port}) - Motor Seçilmedi')
         self.log.appendPlainText(f"[INFO] Bağlandı: {port}\n")
 
     def on_disconnected(self):
+        self._last_motor_sent = None  # yeniden baglaninca secim bastan gonderilsin
+        self._rx_decoder.reset()
         self.status_lbl.setText('Durum: Bağlı değil')
         self.log.appendPlainText("[WARN] Bağlantı koptu, yeniden denenecek...\n")
 
@@ -327,10 +577,20 @@ class MainWindow(QtWidgets.QMainWindow):
 
     def _send_speed_to_arduino(self):
         val = self.slider_speed.value()
-        # Protokol: 'Z' + 4 haneli mikro-saniye (örn: Z1800)
-        cmd = f"Z{val:04d}"
-        for ch in cmd:
-            self.send(ch)
+        # Protokol: 'Z' + 4 haneli mikro-saniye (örn: Z1800) - tek write ile
+        cmd = f"Z{val:04d}".encode('ascii')
+        self.worker.send_bytes(cmd)
+        self._append_operation(f"SEND {cmd.decode('ascii')}")
+
+    # --- Ortak buton slotlari: komut karakteri gonderen butonun property'sinde ---
+    def _on_motion_btn(self):
+        self.handle_motion(self.sender().property('cmd'))
+
+    def _on_servo_btn(self):
+        self.handle_servo(self.sender().property('cmd'))
+
+    def _on_rec_play_btn(self):
+        self._rec_play_action(self.sender().property('cmd'))
 
     def _rec_play_action(self, code: str):
         # Arduino'nun kayıt/oynatma sistemini kullan
@@ -368,61 +628,64 @@ class MainWindow(QtWidgets.QMainWindow):
 
     # --- Operation logging helpers ---
     def _append_operation(self, line: str):
-        ts = QtCore.QDateTime.currentDateTime().toString('yyyy-MM-dd HH:mm:ss.zzz')
-        entry = f"[{ts}] {line}\n"
-        try:
-            with open(self.ops_file, 'a', encoding='utf-8') as f:
-                f.write(entry)
-        except Exception:
-            pass
-        # Ayrica UI log
-        self.log.appendPlainText(entry.rstrip('\n'))
+        ts = self._log_epoch + self._log_elapsed.elapsed() / 1000.0
+        # Dosyadaki insan-okur format yazici thread'de uretilir
+        self._ops_writer.append(ts, line)
+        # Ayrica UI log (timer flush'inda toplu eklenir)
+        self._log_pending.append(f"[{ts:.3f}] {line}\n")
 
     def reset_operations(self):
         self.reverse_actions.clear()
-        for k in self.segment_start_ms.keys():
-            self.segment_start_ms[k] = None
-            self.segment_dir[k] = None
+        for i in range(6):
+            self.segment_start_ms[i] = -1
+            self.segment_dir[i] = 0
         self.servo_angle_local = 0
-        try:
-            open(self.ops_file, 'w', encoding='utf-8').close()
-        except Exception:
-            pass
+        # Bosaltma da yazici thread'in kuyrugundan gecer; siralama korunur
+        self._ops_writer.truncate()
         self._append_operation('RESET')
 
     # --- Çoklu Motor Seçimi Fonksiyonları ---
-    def toggle_motor_selection(self, motor: int, state: int):
+    def _on_motor_toggled(self, motor: int, checked: bool):
         """Motor seçimini toggle et"""
-        if state == 2:  # Qt.Checked
-            self.selected_motors.add(motor)
+        if checked:
+            if motor not in self.selected_motors:
+                bisect.insort(self.selected_motors, motor)
+            if motor == 6:
+                self._servo_selected = True
+            else:
+                self._stepper_selected.add(motor)
             self._append_operation(f"MOTOR M{motor} SELECTED")
         else:
-            self.selected_motors.discard(motor)
+            if motor in self.selected_motors:
+                self.selected_motors.remove(motor)
+            if motor == 6:
+                self._servo_selected = False
+            else:
+                self._stepper_selected.discard(motor)
             self._append_operation(f"MOTOR M{motor} DESELECTED")
-        
+
         # UI güncellemesi
         self.update_motor_status()
 
     def select_all_motors(self):
         """Tüm motorları seç"""
-        for motor in range(1, 7):  # 1-6 arası motorlar
-            self.selected_motors.add(motor)
-            self.motor_checkboxes[motor].setChecked(True)
+        # setChecked -> _on_motor_toggled secim kumelerini gunceller
+        for cb in self.motor_checkboxes:
+            cb.setChecked(True)
         self._append_operation("ALL MOTORS SELECTED")
         self.update_motor_status()
 
     def deselect_all_motors(self):
         """Tüm motor seçimlerini kaldır"""
-        for motor in range(1, 7):  # 1-6 arası motorlar
-            self.selected_motors.discard(motor)
-            self.motor_checkboxes[motor].setChecked(False)
+        for cb in self.motor_checkboxes:
+            cb.setChecked(False)
         self._append_operation("ALL MOTORS DESELECTED")
         self.update_motor_status()
 
     def update_motor_status(self):
         """Seçili motor durumunu UI'da göster"""
         if self.selected_motors:
-            motors_str = ", ".join([f"M{m}" for m in sorted(self.selected_motors)])
+            motors_str = ", ".join([f"M{m}" for m in self.selected_motors])
             self.status_lbl.setText(f'Durum: Bağlı - Seçili Motorlar: {motors_str}')
         else:
             self.status_lbl.setText('Durum: Bağlı - Motor Seçilmedi')
@@ -433,18 +696,23 @@ class MainWindow(QtWidgets.QMainWindow):
             self._append_operation("NO MOTORS SELECTED")
             return
         
-        # Arduino'da motorlar aynı anda çalışabilir, bu yüzden hızlıca gönder
-        for motor in sorted(self.selected_motors):
-            # Motor seçimi için önce motor numarasını gönder
-            self.send(str(motor))
-            # Sonra komutu gönder
-            self.send(command)
-            # Çok kısa bekleme - Arduino'nun komutu işlemesi için
-            QtCore.QThread.msleep(5)
+        # Tum motor-id + komut ciftlerini tek buffer'da topla ve tek write ile gonder;
+        # Arduino ayni USB cercevesinde bitisik byte akisini isleyebiliyor
+        buf = bytearray()
+        cmd_b = self._CMD_BYTES[command]
+        for motor in self.selected_motors:
+            # Arduino'daki aktif motor zaten buysa secim byte'ini atla
+            if motor != self._last_motor_sent:
+                buf += self._MOTOR_BYTES[motor]
+                self._last_motor_sent = motor
+            buf += cmd_b
+        self.worker.send_bytes(bytes(buf))
+        self._append_operation(f"SEND {buf.decode('ascii')}")
 
     # --- Motor/Servo handlers with logging & reverse ---
     def select_motor(self, motor: int):
         self.active_motor = motor
+        self._last_motor_sent = motor
         self.send(str(motor))
         self._append_operation(f"SELECT M{motor}")
 
@@ -457,36 +725,37 @@ class MainWindow(QtWidgets.QMainWindow):
         # Tek motor kontrolü (eski sistem)
         if not self.active_motor or self.active_motor not in (1, 2, 3, 4, 5):
             return
-        now = int(time.time() * 1000)
+        now = _now_ms()
         motor = self.active_motor
+        i = motor - 1
 
         if code in ('d', 'a'):
             # Kapanmamis segment varsa kapat
-            if self.segment_start_ms[motor] is not None and self.segment_dir[motor] is not None:
-                duration = now - int(self.segment_start_ms[motor])
-                inv_dir = 2 if self.segment_dir[motor] == 1 else 1
-                self.reverse_actions.append((motor, inv_dir, max(0, duration)))
+            if self.segment_start_ms[i] >= 0:
+                duration = now - self.segment_start_ms[i]
+                inv_dir = 2 if self.segment_dir[i] == 1 else 1
+                self.reverse_actions.append((motor, inv_dir, duration))
                 self._append_operation(f"M{motor} STOP duration={duration}ms")
             # Yeni segment baslat
-            self.segment_start_ms[motor] = now
-            self.segment_dir[motor] = 1 if code == 'd' else 2
+            self.segment_start_ms[i] = now
+            self.segment_dir[i] = self._MOTION_DIR[code]
             self._append_operation(f"M{motor} START dir={'ILERI' if code=='d' else 'GERI'}")
             self.send(code)
         elif code == 'w':
-            if self.segment_start_ms[motor] is not None and self.segment_dir[motor] is not None:
-                duration = now - int(self.segment_start_ms[motor])
-                inv_dir = 2 if self.segment_dir[motor] == 1 else 1
-                self.reverse_actions.append((motor, inv_dir, max(0, duration)))
+            if self.segment_start_ms[i] >= 0:
+                duration = now - self.segment_start_ms[i]
+                inv_dir = 2 if self.segment_dir[i] == 1 else 1
+                self.reverse_actions.append((motor, inv_dir, duration))
                 self._append_operation(f"M{motor} STOP duration={duration}ms")
-            self.segment_start_ms[motor] = None
-            self.segment_dir[motor] = None
+            self.segment_start_ms[i] = -1
+            self.segment_dir[i] = 0
             self.send('w')
 
     def handle_multi_motor_motion(self, code: str):
         """Çoklu motor için hareket kontrolü"""
-        now = int(time.time() * 1000)
-        stepper_motors = [m for m in self.selected_motors if m in (1, 2, 3, 4, 5)]
-        
+        now = _now_ms()
+        stepper_motors = sorted(self._stepper_selected)
+
         if not stepper_motors:
             self._append_operation("NO STEPPER MOTORS SELECTED")
             return
@@ -494,33 +763,35 @@ class MainWindow(QtWidgets.QMainWindow):
         if code in ('d', 'a'):
             # Tüm seçili stepper motorları için segment başlat
             for motor in stepper_motors:
+                i = motor - 1
                 # Kapanmamis segment varsa kapat
-                if self.segment_start_ms[motor] is not None and self.segment_dir[motor] is not None:
-                    duration = now - int(self.segment_start_ms[motor])
-                    inv_dir = 2 if self.segment_dir[motor] == 1 else 1
-                    self.reverse_actions.append((motor, inv_dir, max(0, duration)))
+                if self.segment_start_ms[i] >= 0:
+                    duration = now - self.segment_start_ms[i]
+                    inv_dir = 2 if self.segment_dir[i] == 1 else 1
+                    self.reverse_actions.append((motor, inv_dir, duration))
                     self._append_operation(f"M{motor} STOP duration={duration}ms")
-                
+
                 # Yeni segment baslat
-                self.segment_start_ms[motor] = now
-                self.segment_dir[motor] = 1 if code == 'd' else 2
-            
+                self.segment_start_ms[i] = now
+                self.segment_dir[i] = self._MOTION_DIR[code]
+
             motors_str = ", ".join([f"M{m}" for m in stepper_motors])
             self._append_operation(f"MULTI MOTOR START {motors_str} dir={'ILERI' if code=='d' else 'GERI'}")
-            
+
             # Tüm motorlara komut gönder
             self.send_to_selected_motors(code)
-            
+
         elif code == 'w':
             # Tüm seçili motorları durdur
             for motor in stepper_motors:
-                if self.segment_start_ms[motor] is not None and self.segment_dir[motor] is not None:
-                    duration = now - int(self.segment_start_ms[motor])
-                    inv_dir = 2 if self.segment_dir[motor] == 1 else 1
-                    self.reverse_actions.append((motor, inv_dir, max(0, duration)))
+                i = motor - 1
+                if self.segment_start_ms[i] >= 0:
+                    duration = now - self.segment_start_ms[i]
+                    inv_dir = 2 if self.segment_dir[i] == 1 else 1
+                    self.reverse_actions.append((motor, inv_dir, duration))
                     self._append_operation(f"M{motor} STOP duration={duration}ms")
-                self.segment_start_ms[motor] = None
-                self.segment_dir[motor] = None
+                self.segment_start_ms[i] = -1
+                self.segment_dir[i] = 0
             
             motors_str = ", ".join([f"M{m}" for m in stepper_motors])
             self._append_operation(f"MULTI MOTOR STOP {motors_str}")
@@ -537,39 +808,26 @@ class MainWindow(QtWidgets.QMainWindow):
         # Tek motor kontrolü (eski sistem)
         if self.active_motor != 6:
             return
-        if code == 'c':
-            self.servo_angle_local = 0
-        elif code == '[':
-            self.servo_angle_local = min(180, self.servo_angle_local + 15)
-        elif code == ']':
-            self.servo_angle_local = max(0, self.servo_angle_local - 15)
-        elif code == 'd':
-            self.servo_angle_local = min(180, self.servo_angle_local + 60)
-        elif code == 'a':
-            self.servo_angle_local = max(0, self.servo_angle_local - 60)
+        self._apply_servo_code(code)
         self._append_operation(f"SERVO angle~{self.servo_angle_local}")
         self.send(code)
 
+    def _apply_servo_code(self, code: str):
+        op, val = self._SERVO_DELTA.get(code, ('add', 0))
+        if op == 'set':
+            self.servo_angle_local = val
+        else:
+            self.servo_angle_local = max(0, min(180, self.servo_angle_local + val))
+
     def handle_multi_motor_servo(self, code: str):
         """Çoklu motor için servo kontrolü"""
-        servo_motors = [m for m in self.selected_motors if m == 6]
-        
-        if not servo_motors:
+        if not self._servo_selected:
             self._append_operation("NO SERVO MOTOR SELECTED")
             return
-        
+
         # Servo açısını güncelle
-        if code == 'c':
-            self.servo_angle_local = 0
-        elif code == '[':
-            self.servo_angle_local = min(180, self.servo_angle_local + 15)
-        elif code == ']':
-            self.servo_angle_local = max(0, self.servo_angle_local - 15)
-        elif code == 'd':
-            self.servo_angle_local = min(180, self.servo_angle_local + 60)
-        elif code == 'a':
-            self.servo_angle_local = max(0, self.servo_angle_local - 60)
-        
+        self._apply_servo_code(code)
+
         self._append_operation(f"MULTI SERVO angle~{self.servo_angle_local}")
         
         # Servo komutunu gönder
@@ -580,7 +838,7 @@ class MainWindow(QtWidgets.QMainWindow):
         if self.selected_motors:
             self.return_to_home_multi()
             return
-        
+
         # Tek motor kontrolü (eski sistem)
         # Servo -> 0 derece
         if self.active_motor != 6:
@@ -588,41 +846,62 @@ class MainWindow(QtWidgets.QMainWindow):
         self.send('c')  # absolute 0°
         self._append_operation('SERVO -> 0')
 
-        # Stepper hareketlerini tersinden oyna
-        for motor, inv_dir, duration in reversed(self.reverse_actions):
-            if self.active_motor != motor:
-                self.select_motor(motor)
-            self.send('d' if inv_dir == 1 else 'a')
-            QtWidgets.QApplication.processEvents()
-            QtCore.QThread.msleep(max(0, duration))
-            self.send('w')
-        self._append_operation('HOME DONE')
-        # Temizle
+        # Stepper hareketlerini tersinden, QTimer adimlariyla oyna
+        steps = list(reversed(self.reverse_actions))
         self.reverse_actions.clear()
+        self._start_home_playback(steps, 'HOME DONE')
 
     def return_to_home_multi(self):
         """Çoklu motor için home'a dönüş"""
         # Servo motorları varsa 0'a getir
-        if 6 in self.selected_motors:
+        if self._servo_selected:
+            self._last_motor_sent = 6
             self.send('6')  # Motor 6'yı seç
             self.send('c')  # Servo'yu 0'a getir
             self._append_operation('MULTI SERVO -> 0')
 
-        # Stepper motorları için ters hareket
-        stepper_motors = [m for m in self.selected_motors if m in (1, 2, 3, 4, 5)]
-        if stepper_motors:
-            # Ters hareketleri oynat
-            for motor, inv_dir, duration in reversed(self.reverse_actions):
-                if motor in stepper_motors:
-                    self.send(str(motor))  # Motor seç
-                    self.send('d' if inv_dir == 1 else 'a')  # Ters yönde hareket
-                    QtWidgets.QApplication.processEvents()
-                    QtCore.QThread.msleep(max(0, duration))
-                    self.send('w')  # Dur
-        
-        self._append_operation('MULTI HOME DONE')
-        # Temizle
+        # Sadece secili stepper motorlarin ters hareketleri oynatilir
+        steps = [s for s in reversed(self.reverse_actions) if s[0] in self._stepper_selected]
         self.reverse_actions.clear()
+        self._start_home_playback(steps, 'MULTI HOME DONE')
+
+    # --- Home oynatma durum makinesi ---
+    # GUI thread'ini bloklamadan adim adim ilerler: her adimda yon komutu
+    # gonderilir, sure dolunca QTimer 'w' gonderip siradaki adima gecer.
+    def _start_home_playback(self, steps: list[tuple[int, int, int]], done_msg: str):
+        # Onceki zincir bitmeden ikinci oynatma baslarsa iki zincir ayni
+        # listeden adim caldigindan kol fiziksel olarak yanlis hareket eder
+        if self._home_active:
+            return
+        self._home_active = True
+        self.btn_home.setEnabled(False)
+        self._home_steps = steps
+        self._home_done_msg = done_msg
+        # Adim basina SELECT/SEND satirlari yerine tek ozet girdi
+        if steps:
+            self._append_operation(f"HOME REPLAY {len(steps)} steps")
+        self._home_tick()
+
+    def _home_tick(self):
+        if not self._home_steps:
+            self._append_operation(self._home_done_msg)
+            self._home_active = False
+            self.btn_home.setEnabled(True)
+            return
+        motor, inv_dir, duration = self._home_steps.pop(0)
+        # Secim + yon tek write ile; log'a adim basina girdi yazilmaz
+        buf = bytearray()
+        if motor != self._last_motor_sent:
+            buf += self._MOTOR_BYTES[motor]
+            self._last_motor_sent = motor
+        buf += self._CMD_BYTES['d' if inv_dir == 1 else 'a']
+        self.active_motor = motor
+        self.worker.send_bytes(bytes(buf))
+        QtCore.QTimer.singleShot(max(0, duration), self._home_stop_then_next)
+
+    def _home_stop_then_next(self):
+        self.worker.send_bytes(self._CMD_BYTES['w'])
+        self._home_tick()
 
 
 def main():
@@ -1,7 +1,8 @@
 import sys
+import threading
 import time
 import select
-from typing import Any
+from typing import Any, Optional
 
 
 HELP_TEXT = (
@@ -51,16 +52,87 @@ def open_serial(port: str, baud: int = 9600, timeout: float = 0.1) -> Any:
     return ser
 
 
-def forward_serial_output(ser: Any):
-    """Seriden gelen satirlari ekrana yaz (non-blocking)."""
-    try:
-        waiting = getattr(ser, "in_waiting", 0)
-        data = ser.read(waiting or 1)
+def reader_loop(ser: Any):
+    """Seriden gelen veriyi ekrana yaz (arka plan thread'i).
+
+    Bloklayan read() port timeout'una kadar bekler; ana donguyu mesgul
+    etmeden byte gelir gelmez yazar.
+    """
+    while True:
+        try:
+            data = ser.read(ser.in_waiting or 1)
+        except Exception:
+            break
         if data:
             sys.stdout.write(data.decode(errors="ignore"))
             sys.stdout.flush()
-    except Exception:
-        pass
+
+
+def read_key() -> Optional[str]:
+    """Konsoldan tek karakter oku (bloklayan, platforma gore).
+
+    Donus: karakter, None (tus okunamadi, tekrar dene) veya '' (EOF,
+    stdin kapandi — boru/yonlendirme bitti, dongu sonlanmali).
+    """
+    if sys.platform.startswith("win"):
+        try:
+            import msvcrt  # type: ignore
+            return msvcrt.getwch()  # Unicode char, bloklar
+        except Exception:
+            return None
+    # POSIX: stdin hazir olana kadar bekle (timeout yok, polling yok).
+    # cbreak modunda read(1) Enter beklemeden tus basina doner.
+    # EOF'ta select surekli "hazir" der ve read '' dondurur; '' oldugu
+    # gibi iletilir ki cagiran spin yapmadan cikabilsin.
+    select.select([sys.stdin], [], [])
+    return sys.stdin.read(1)
+
+
+def key_pending(timeout: float = 0.005) -> bool:
+    """Kisa sure icinde yeni tus gelir mi? (yazma birlestirme icin)"""
+    if sys.platform.startswith("win"):
+        try:
+            import msvcrt  # type: ignore
+            deadline = time.monotonic() + timeout
+            while not msvcrt.kbhit():
+                if time.monotonic() >= deadline:
+                    return False
+                time.sleep(0.001)
+            return True
+        except Exception:
+            return False
+    return bool(select.select([sys.stdin], [], [], timeout)[0])
+
+
+class _CbreakStdin:
+    """POSIX'te stdin'i cbreak moduna alir, cikista eski haline dondurur.
+
+    cbreak olmadan stdin satir tamponludur: select stdin'i "hazir" gosterse
+    bile read(1) Enter'a kadar bloklar. Windows'ta ve tty olmayan
+    girislerde sessizce hicbir sey yapmaz.
+    """
+
+    def __enter__(self):
+        self._old_attrs = None
+        if not sys.platform.startswith("win"):
+            try:
+                import termios
+                import tty
+                fd = sys.stdin.fileno()
+                self._old_attrs = (termios, fd, termios.tcgetattr(fd))
+                tty.setcbreak(fd)
+            except Exception:
+                self._old_attrs = None
+        return self
+
+    def __exit__(self, *exc):
+        if self._old_attrs is not None:
+            termios, fd, attrs = self._old_attrs
+            try:
+                termios.tcsetattr(fd, termios.TCSADRAIN, attrs)
+            except Exception:
+                pass
+        return False
 
 
 def main():
@@ -84,39 +156,39 @@ def main():
     print("Baglandi. 'h' yardim, 'q' cikis.")
     print(HELP_TEXT)
 
+    # Seri cikti arka plan thread'inde akar; ana thread klavyede bloklanir.
+    # Polling donguleri yok: tus basimi ~aninda seriye gider.
+    reader = threading.Thread(target=reader_loop, args=(ser,), daemon=True)
+    reader.start()
+
+    # Tus tekrarinda write-syscall firtinasini onlemek icin birlestirme tamponu
+    pending = bytearray()
     try:
-        while True:
-            forward_serial_output(ser)
-
-            # Konsoldan tek karakter oku (non-blocking icin Windows'ta msvcrt kullanilabilir)
-            ch = None
-            if sys.platform.startswith("win"):
-                try:
-                    import msvcrt  # type: ignore
-                    if msvcrt.kbhit():
-                        b = msvcrt.getwch()  # Unicode char
-                        ch = b
-                except Exception:
-                    pass
-            else:
-                # POSIX: basit bir input prompt'u ile (blocking). Isterseniz termios ile gelistirin.
-                ch = sys.stdin.read(1) if sys.stdin in select.select([sys.stdin], [], [], 0.02)[0] else None
-
-            if not ch:
-                time.sleep(0.02)
-                continue
-
-            if ch == "q":
-                print("\nCikis...")
-                break
-            if ch == "h":
-                print(HELP_TEXT)
-                continue
-
-            # Gecerli komutlari seriye gonder
-            # Arduino tarafinda tek karakterler bekleniyor
-            ser.write(ch.encode("utf-8", errors="ignore"))
-            # Yeni satir GEREKMIYOR; Arduino tek char okuyor. Isterseniz:\n
+        with _CbreakStdin():
+            while True:
+                ch = read_key()
+                if ch is None:
+                    continue
+
+                if ch == "q" or ch == "":  # '' = stdin EOF (boru bitti)
+                    if pending:
+                        ser.write(bytes(pending))
+                    print("\nCikis...")
+                    break
+                if ch == "h":
+                    print(HELP_TEXT)
+                    continue
+
+                # Gecerli komutlari seriye gonder
+                # Arduino tarafinda tek karakterler bekleniyor
+                pending += ch.encode("utf-8", errors="ignore")
+                # 'w' (dur) aninda gitmeli; diger tuslar 5 ms icinde devami
+                # geliyorsa ve tampon kucukse biriktirilip tek write ile gider
+                if ch != "w" and len(pending) < 16 and key_pending():
+                    continue
+                ser.write(bytes(pending))
+                pending.clear()
+                # Yeni satir GEREKMIYOR; Arduino tek char okuyor. Isterseniz:\n
     finally:
         try:
             ser.close()